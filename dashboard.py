@@ -1,4 +1,20 @@
+import hashlib
+import io
+import json
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+import numpy as np
+import openai
+import orjson
+import pandas as pd
 import streamlit as st
+import tiktoken
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from utils import preprocess_review_list
 
 print("dashboard.py started")
 
@@ -15,6 +31,359 @@ def go_to(page_name: str):
     st.session_state.page = page_name
 
 
+# =========================
+#  LLM HELPERS (SHARED)
+# =========================
+@st.cache_resource
+def get_openai_client():
+    # One client per process (using Streamlit secrets)
+    return openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+
+
+def chat_cache_key(model, messages, max_tokens, temperature, response_format=None, seed=None):
+    payload = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "response_format": response_format,
+        "seed": seed,
+        "tools": None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class CacheMiss(Exception):
+    pass
+
+
+def raise_cache_miss():
+    raise CacheMiss
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_chat(cache_key, _compute):
+    # Exact-match cache keyed only by cache_key. _compute runs on a miss;
+    # raise_cache_miss turns the call into a pure lookup (exceptions are not cached).
+    return _compute()
+
+
+# Stream chunks that end a paragraph or a JSON string (raw or JSON-escaped newline, quote)
+STREAM_FLUSH_MARKERS = ("\n", "\\n", '"')
+
+
+def stream_chat(
+    model, messages, max_tokens, temperature, response_format=None, seed=None, on_delta=None
+):
+    """
+    Streams a chat completion and returns (full text, finish_reason).
+    on_delta(text_so_far) is called at paragraph boundaries, not on every token,
+    so the UI re-renders a handful of times instead of once per chunk.
+    """
+    kwargs = {"response_format": response_format} if response_format else {}
+    if seed is not None:
+        kwargs["seed"] = seed
+    response = get_openai_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        **kwargs,
+    )
+    buffer = io.StringIO()
+    finish_reason = None
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+        delta = choice.delta.content
+        if not delta:
+            continue
+        buffer.write(delta)
+        if on_delta is not None and any(marker in delta for marker in STREAM_FLUSH_MARKERS):
+            on_delta(buffer.getvalue())
+    return buffer.getvalue(), finish_reason
+
+
+@st.cache_resource
+def get_tokenizer():
+    # BPE encoder shared by GPT-4o / GPT-4.1, built once per process
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+# Token-accurate limiter (tiktoken): keeps whole reviews until the budget is spent
+def truncate_reviews_by_tokens(reviews, max_tokens=8000):
+    enc = get_tokenizer()
+    token_ids = enc.encode_batch(reviews)
+    # Running token total (+1 per review for the newline separator)
+    totals = list(accumulate(len(ids) + 1 for ids in token_ids))
+    kept = bisect_right(totals, max_tokens)
+    if kept == 0 and reviews:
+        # A single review larger than the budget is cut instead of dropped
+        return enc.decode(token_ids[0][:max_tokens])
+    return "\n".join(reviews[:kept])
+
+
+AI_ERROR_PREFIX = "**Error during AI interpretation:**"
+
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant that analyzes customer feedback and generates insights. "
+    "Don't use the customer names on your report, just analyse attributes, outcomes as given requirements by code. "
+    "Don't list the reviews like review 1, review 2, the user is trying to understand the similarities and common patterns. "
+    "The user should know what's wrong with the product or services, what the pain points are, and what the repeating problems are. "
+    "Return a JSON object with the keys sentiment, swot and insights; each value is a Markdown-formatted string."
+)
+
+# Keys of the single JSON answer returned for an analysis request
+ANALYSIS_KEYS = ("sentiment", "swot", "insights")
+
+
+def parse_analysis(raw):
+    """
+    Splits the JSON answer into (sentiment, swot, insights) strings.
+    Non-string values are pretty-printed; on failure every section shows the error.
+    """
+    if raw.startswith(AI_ERROR_PREFIX):
+        return (raw,) * len(ANALYSIS_KEYS)
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        return (f"{AI_ERROR_PREFIX} could not parse the model answer: {e}",) * len(ANALYSIS_KEYS)
+    if not isinstance(data, dict):
+        return (f"{AI_ERROR_PREFIX} the model answer is not a JSON object.",) * len(ANALYSIS_KEYS)
+
+    sections = []
+    for key in ANALYSIS_KEYS:
+        value = data.get(key, "")
+        sections.append(value if isinstance(value, str) else json.dumps(value, indent=2))
+    return tuple(sections)
+
+
+def is_analysis_object(raw):
+    # Only a complete JSON object is worth caching; parse_analysis reports the rest
+    try:
+        return isinstance(json.loads(raw), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+_SECTION_START_RE = re.compile(r'"(' + "|".join(ANALYSIS_KEYS) + r')"\s*:\s*"')
+_JSON_STRING_BODY_RE = re.compile(r'(?:[^"\\]|\\.)*')
+_PARTIAL_ESCAPE_RE = re.compile(r'\\u[0-9a-fA-F]{0,3}$')
+
+
+def parse_partial_analysis(raw):
+    """
+    Best-effort read of the section strings from an incomplete JSON answer,
+    so each section can be rendered while the answer is still streaming.
+    Returns {key: text_so_far} for the sections that have started.
+    """
+    sections = {}
+    for match in _SECTION_START_RE.finditer(raw):
+        body = _JSON_STRING_BODY_RE.match(raw, match.end()).group(0)
+        body = _PARTIAL_ESCAPE_RE.sub("", body)
+        try:
+            sections[match.group(1)] = json.loads(f'"{body}"')
+        except json.JSONDecodeError:
+            continue
+    return sections
+
+
+# Semantic cache: reuse a prior answer when the new prompt is close enough
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_ENTRIES = 50
+EMBEDDING_MAX_TOKENS = 8191  # input limit of text-embedding-3-small
+
+
+@st.cache_resource
+def get_embedding_tokenizer():
+    # The embedding model has its own encoding (cl100k_base), built once per process
+    return tiktoken.encoding_for_model(EMBEDDING_MODEL)
+
+
+def embed_text(text):
+    # Inputs over the model limit are rejected by the API, so cut them first
+    enc = get_embedding_tokenizer()
+    token_ids = enc.encode(text)
+    if len(token_ids) > EMBEDDING_MAX_TOKENS:
+        text = enc.decode(token_ids[:EMBEDDING_MAX_TOKENS])
+    response = get_openai_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return np.asarray(response.data[0].embedding, dtype=np.float32)
+
+
+def semantic_lookup(entries, query):
+    """
+    entries: [(embedding, response), ...] for a single task.
+    Returns the cached response with the highest cosine similarity to query
+    if it exceeds SEMANTIC_CACHE_THRESHOLD, otherwise None.
+    """
+    if not entries:
+        return None
+    mat = np.vstack([embedding for embedding, _ in entries])
+    sims = mat @ query / (np.linalg.norm(mat, axis=1) * np.linalg.norm(query))
+    best = int(np.argmax(sims))
+    if sims[best] > SEMANTIC_CACHE_THRESHOLD:
+        return entries[best][1]
+    return None
+
+
+# =========================
+#  FILE LOADING
+# =========================
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls", ".json", ".jsonl", ".xml")
+CSV_CHUNK_SIZE = 50_000
+PREVIEW_ROWS = 5
+MAX_REVIEWS = 50  # reviews sent to the analysis
+TEXT_COLUMN_RE = re.compile(r"review|feedback|comment|text", re.IGNORECASE)
+
+
+# Parsing is cached by file content: Streamlit hashes file_bytes, so widget
+# reruns on the same upload skip the parse entirely.
+@st.cache_data(show_spinner=False)
+def load_dataframe(file_bytes: bytes, name: str) -> pd.DataFrame:
+    """
+    Full parse, only used for formats pandas cannot stream (.json, .xml).
+    JSON is decoded with orjson, which is several times faster than pd.read_json.
+    """
+    if name.endswith(".json"):
+        return pd.DataFrame(orjson.loads(file_bytes))
+    return pd.read_xml(io.BytesIO(file_bytes))
+
+
+def read_jsonl_chunks(buffer, chunksize):
+    # Values stay as given (no "007" -> 7.0 or date coercion), like CSV's dtype=str
+    return pd.read_json(
+        buffer, lines=True, chunksize=chunksize, dtype=False, convert_dates=False
+    )
+
+
+@st.cache_data(show_spinner=False)
+def read_columns(file_bytes: bytes, name: str) -> pd.Index:
+    """
+    Returns the column names without parsing any data rows
+    (CSV / Excel read only the header; JSON Lines collects the keys of the
+    preview records, since a key may be missing from the first line).
+    """
+    buffer = io.BytesIO(file_bytes)
+    if name.endswith(".csv"):
+        return pd.read_csv(buffer, nrows=0, engine="c").columns
+    if name.endswith((".xlsx", ".xls")):
+        return pd.read_excel(buffer, nrows=0, engine="calamine").columns
+    if name.endswith(".jsonl"):
+        return next(iter(read_jsonl_chunks(buffer, PREVIEW_ROWS))).columns
+    return load_dataframe(file_bytes, name).columns
+
+
+@st.cache_data(show_spinner=False)
+def read_preview(file_bytes: bytes, name: str, columns=None) -> pd.DataFrame:
+    """
+    Parses only the first PREVIEW_ROWS rows, projected to `columns` when given.
+    """
+    buffer = io.BytesIO(file_bytes)
+    if name.endswith(".csv"):
+        return pd.read_csv(
+            buffer, usecols=columns, dtype=str, nrows=PREVIEW_ROWS, engine="c"
+        )
+    if name.endswith((".xlsx", ".xls")):
+        return pd.read_excel(
+            buffer, usecols=columns, dtype=str, nrows=PREVIEW_ROWS, engine="calamine"
+        )
+    if name.endswith(".jsonl"):
+        df = next(iter(read_jsonl_chunks(buffer, PREVIEW_ROWS)))
+    else:
+        df = load_dataframe(file_bytes, name).head(PREVIEW_ROWS)
+    return df if columns is None else df[columns]
+
+
+@st.cache_data(show_spinner=False)
+def load_text_column(file_bytes: bytes, name: str, column: str, limit: int = MAX_REVIEWS) -> list:
+    """
+    Returns the first `limit` non-null values of a single column as strings.
+    CSV and JSON Lines are parsed in chunks and reading stops once `limit` is reached.
+    """
+    buffer = io.BytesIO(file_bytes)
+    if name.endswith(".csv"):
+        chunks = pd.read_csv(
+            buffer, usecols=[column], dtype=str, engine="c", chunksize=CSV_CHUNK_SIZE
+        )
+    elif name.endswith(".jsonl"):
+        chunks = read_jsonl_chunks(buffer, CSV_CHUNK_SIZE)
+    elif name.endswith((".xlsx", ".xls")):
+        chunks = [pd.read_excel(buffer, usecols=[column], engine="calamine")]
+    else:
+        chunks = [load_dataframe(file_bytes, name)]
+
+    values = []
+    for chunk in chunks:
+        if column not in chunk:
+            # A JSON Lines chunk where no record has this key
+            continue
+        # Only the values we keep are converted to Python strings
+        values.extend(chunk[column].dropna().head(limit - len(values)).astype(str))
+        if len(values) >= limit:
+            break
+    return values
+
+
+@st.cache_data(show_spinner=False)
+def preprocess_cached(reviews: list) -> list:
+    return preprocess_review_list(reviews)
+
+
+# =========================
+#  PDF REPORT
+# =========================
+# Unicode font (adjust path if needed on your system)
+REPORT_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+class PDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Register the Unicode font up front so header() can use it on add_page()
+        self.add_font("DejaVu", "", REPORT_FONT_PATH)
+
+    def header(self):
+        self.set_font("DejaVu", "", 14)
+        self.cell(
+            0,
+            10,
+            "Client Feedback Analyzer Report",
+            new_x=XPos.LMARGIN,
+            new_y=YPos.NEXT,
+            align="C",
+        )
+
+
+# Pure function of the three result strings; the cache is shared by all sessions
+@st.cache_data(show_spinner=False, max_entries=8)
+def create_pdf_report(sentiment, swot, insight):
+    pdf = PDF()
+    pdf.add_page()
+    pdf.set_font("DejaVu", "", 12)
+
+    pdf.cell(0, 10, "📝 Sentiment Analysis:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.multi_cell(0, 10, sentiment)
+    pdf.ln(5)
+
+    pdf.cell(0, 10, "🏋️ SWOT Analysis:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.multi_cell(0, 10, swot)
+    pdf.ln(5)
+
+    pdf.cell(0, 10, "🔎 AI Insights on Patterns & Anomalies:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.multi_cell(0, 10, insight)
+    pdf.ln(5)
+
+    # fpdf2 writes the bytes straight into the buffer (no str -> latin1 copy)
+    buffer = io.BytesIO()
+    pdf.output(buffer)
+    return buffer.getvalue()
+
+
 # =========================
 #  APP 1: CLIENT FEEDBACK ANALYZER (NO LOGIN)
 # =========================
@@ -31,55 +400,86 @@ def run_client_feedback_analyzer():
 
     # ========== APP WITHOUT LOGIN ==========
 
-    import pandas as pd
-    import openai
-    from utils import preprocess_reviews
-    from fpdf import FPDF
-
-    # OpenAI Client (using Streamlit secrets)
-    client = openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+    # LLM cache stats for this session
+    if "llm_cache_stats" not in st.session_state:
+        st.session_state.llm_cache_stats = {"hits": 0, "misses": 0, "semantic_hits": 0}
+
+    # One semantic cache per session, partitioned by task to avoid cross-task hits
+    if "sem_cache" not in st.session_state:
+        st.session_state.sem_cache = {}
+
+    # Cache misses recorded during this run
+    cache_misses = []
+
+    # AI interpretation helper (one JSON answer with all analyses, streamed on a cache miss)
+    # lookup_only=True checks the exact cache and returns None on a miss
+    def ai_interpretation(prompt, on_delta=None, lookup_only=False):
+        model = "gpt-4.1"
+        max_tokens = 1500
+        # Deterministic sampling: extractive analysis gains nothing from 0.7, and a
+        # stable answer lets the exact cache and server-side prompt caching hit.
+        # Expect more stable, less "creative" phrasing than before.
+        temperature = 0
+        seed = 0
+        response_format = {"type": "json_object"}
+        messages = [
+            {
+                "role": "system",
+                "content": ANALYSIS_SYSTEM_PROMPT,
+            },
+            {"role": "user", "content": prompt},
+        ]
+        cache_key = chat_cache_key(
+            model, messages, max_tokens, temperature, response_format, seed
+        )
+        try:
+            return cached_chat(cache_key, raise_cache_miss)
+        except CacheMiss:
+            if lookup_only:
+                return None
+            cache_misses.append(prompt)
 
-    # AI interpretation helper
-    def ai_interpretation(prompt):
         try:
-            response = client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a helpful AI assistant that analyzes customer feedback and generates insights. "
-                            "Don't use the customer names on your report, just analyse attributes, outcomes as given requirements by code. "
-                            "Don't list the reviews like review 1, review 2, the user is trying to understand the similarities and common patterns. "
-                            "The user should know what's wrong with the product or services, what the pain points are, and what the repeating problems are."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=500,
-                temperature=0.7,
+            text, finish_reason = stream_chat(
+                model, messages, max_tokens, temperature, response_format, seed, on_delta
             )
-            return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"**Error during AI interpretation:** {e}"
-
-    # Simple word-based limiter
-    def truncate_text_by_tokens(text, max_tokens=1500):
-        words = text.split()
-        truncated = []
-        token_count = 0
-        for word in words:
-            token_count += 1
-            if token_count > max_tokens:
-                break
-            truncated.append(word)
-        return " ".join(truncated)
+            return f"{AI_ERROR_PREFIX} {e}"
+
+        # Truncated or malformed answers are not cached, so the next click retries
+        if finish_reason == "length":
+            return f"{AI_ERROR_PREFIX} the answer was cut off at {max_tokens} tokens."
+        if not is_analysis_object(text):
+            return text
+        return cached_chat(cache_key, lambda: text)
+
+    # Exact cache first, then the semantic cache, then the model.
+    # Only the reviews are embedded: the prompt template is the same for every request.
+    # Returns (result, embedding to store or None, "semantic" | "llm")
+    def analyze(prompt, reviews, entries, on_delta=None):
+        cached = ai_interpretation(prompt, lookup_only=True)
+        if cached is not None:
+            return cached, None, "llm"
+
+        try:
+            query = embed_text(reviews)
+        except Exception:
+            return ai_interpretation(prompt, on_delta), None, "llm"
+
+        cached = semantic_lookup(entries, query)
+        if cached is not None:
+            return cached, None, "semantic"
+
+        result = ai_interpretation(prompt, on_delta)
+        if result.startswith(AI_ERROR_PREFIX):
+            return result, None, "llm"
+        return result, query, "llm"
 
     # Data input section
     st.subheader("Upload a dataset or paste your customer reviews below")
 
     uploaded_file = st.file_uploader(
-        "Upload your feedback dataset", type=["csv", "xlsx", "xls", "json", "xml"]
+        "Upload your feedback dataset", type=["csv", "xlsx", "xls", "json", "jsonl", "xml"]
     )
 
     # Initialize reviews list in session_state for persistence
@@ -88,29 +488,20 @@ def run_client_feedback_analyzer():
 
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith((".xlsx", ".xls")):
-                df = pd.read_excel(uploaded_file)
-            elif uploaded_file.name.endswith(".json"):
-                df = pd.read_json(uploaded_file)
-            elif uploaded_file.name.endswith(".xml"):
-                df = pd.read_xml(uploaded_file)
-            else:
+            if not uploaded_file.name.endswith(SUPPORTED_EXTENSIONS):
                 st.error("Unsupported file format.")
                 st.stop()
 
+            file_bytes = uploaded_file.getvalue()
+            columns = read_columns(file_bytes, uploaded_file.name)
+
+            mask = columns.astype(str).str.contains(TEXT_COLUMN_RE, regex=True)
+            possible_cols = columns[mask].tolist()
+
+            # Preview only the candidate text columns (all columns if none matched)
             st.write("### Data Preview")
-            st.dataframe(df.head())
-
-            possible_cols = [
-                col
-                for col in df.columns
-                if any(
-                    keyword in col.lower()
-                    for keyword in ["review", "feedback", "comment", "text"]
-                )
-            ]
+            st.dataframe(read_preview(file_bytes, uploaded_file.name, possible_cols or None))
+
             if not possible_cols:
                 st.warning("No suitable text column found. Please paste your reviews below.")
                 st.session_state.reviews = []
@@ -118,8 +509,9 @@ def run_client_feedback_analyzer():
                 chosen_col = st.selectbox(
                     "Select the text column for analysis", possible_cols
                 )
-                st.session_state.reviews = (
-                    df[chosen_col].dropna().astype(str).tolist()
+                # Only the chosen column (first MAX_REVIEWS values) is read from the file
+                st.session_state.reviews = load_text_column(
+                    file_bytes, uploaded_file.name, chosen_col
                 )
 
         except Exception as e:
@@ -132,91 +524,109 @@ def run_client_feedback_analyzer():
         st.info("Or paste your customer reviews (one per line) below:")
         raw_text = st.text_area("Paste reviews here", height=200, value="")
         if raw_text.strip():
-            st.session_state.reviews = [
-                line.strip() for line in raw_text.split("\n") if line.strip()
-            ]
+            st.session_state.reviews = list(
+                filter(None, map(str.strip, raw_text.splitlines()))
+            )
 
     if not st.session_state.reviews:
         st.warning("Please upload a dataset or paste some reviews to analyze.")
         st.stop()
 
     if st.button("Analyze It"):
-        # Preprocess
-        reviews_clean_full = preprocess_reviews(
-            "\n".join(st.session_state.reviews[:50])
-        )  # limit to 50 reviews
-        reviews_clean = truncate_text_by_tokens(reviews_clean_full, max_tokens=1500)
+        selected_reviews = st.session_state.reviews[:MAX_REVIEWS]  # limit to MAX_REVIEWS reviews
 
-        # Prompts
-        sentiment_prompt = f"""
-Analyze the sentiment of the following customer reviews. Provide an overall summary of positive, negative, and neutral sentiments, and highlight any patterns or anomalies.
+        # Content fingerprint of the selected reviews
+        fp = hashlib.blake2b(
+            "\x00".join(selected_reviews).encode(), digest_size=16
+        ).hexdigest()
 
-Customer reviews:
-\"\"\"{reviews_clean}\"\"\""""
+        # Result sections are laid out first so the answer can stream into them
+        st.markdown("## 📝 Sentiment Analysis")
+        sentiment_placeholder = st.empty()
 
-        swot_prompt = f"""
-Perform a SWOT analysis (Strengths, Weaknesses, Opportunities, Threats) based on the following customer feedback dataset:
+        st.markdown("## 🏋️ SWOT Analysis")
+        swot_placeholder = st.empty()
 
-\"\"\"{reviews_clean}\"\"\""""
+        st.markdown("## 🔎 AI Insights on Patterns & Anomalies")
+        insight_placeholder = st.empty()
 
-        insight_prompt = f"""
-Analyze the following customer feedback and provide insights about key themes, patterns, anomalies, and recommendations for the product/service.
+        placeholders = dict(
+            zip(ANALYSIS_KEYS, (sentiment_placeholder, swot_placeholder, insight_placeholder))
+        )
 
-\"\"\"{reviews_clean}\"\"\""""
+        def render_partial(raw_so_far):
+            for key, text in parse_partial_analysis(raw_so_far).items():
+                placeholders[key].markdown(text)
 
-        # AI analyses
-        with st.spinner("Analyzing customer feedback..."):
-            sentiment_result = ai_interpretation(sentiment_prompt)
-            swot_result = ai_interpretation(swot_prompt)
-            insight_result = ai_interpretation(insight_prompt)
+        if fp == st.session_state.get("last_fp"):
+            # Same reviews as the last analysis: reuse the results and PDF as-is
+            sentiment_result, swot_result, insight_result, pdf_report = (
+                st.session_state.last_results
+            )
+        else:
+            # Preprocess
+            reviews_clean_list = preprocess_cached(selected_reviews)
+            reviews_clean = truncate_reviews_by_tokens(reviews_clean_list, max_tokens=8000)
 
-        # Show results
-        st.markdown("## 📝 Sentiment Analysis")
-        st.write(sentiment_result)
+            # Single prompt: the reviews are sent once for all three analyses
+            analysis_prompt = f"""
+Analyze the following customer reviews and complete three tasks:
 
-        st.markdown("## 🏋️ SWOT Analysis")
-        st.write(swot_result)
+sentiment: Analyze the sentiment of the reviews. Provide an overall summary of positive, negative, and neutral sentiments, and highlight any patterns or anomalies.
 
-        st.markdown("## 🔎 AI Insights on Patterns & Anomalies")
-        st.write(insight_result)
+swot: Perform a SWOT analysis (Strengths, Weaknesses, Opportunities, Threats) based on the feedback.
 
-        st.success("✅ All analyses completed successfully.")
+insights: Provide insights about key themes, patterns, anomalies, and recommendations for the product/service.
 
-        class PDF(FPDF):
-            def header(self):
-                self.set_font("DejaVu", "", 14)
-                self.cell(0, 10, "Client Feedback Analyzer Report", 0, 1, "C")
-
-        def create_pdf_report(sentiment, swot, insight):
-            pdf = PDF()
-            pdf.add_page()
-
-            # Unicode font (adjust path if needed on your system)
-            pdf.add_font(
-                "DejaVu",
-                "",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                uni=True,
+Customer reviews:
+\"\"\"{reviews_clean}\"\"\""""
+
+            task = "analysis"
+            sem_cache = st.session_state.sem_cache
+            with st.spinner("Analyzing customer feedback..."):
+                raw_result, embedding, source = analyze(
+                    analysis_prompt,
+                    reviews_clean,
+                    sem_cache.get(task, []),
+                    on_delta=render_partial,
+                )
+
+            sentiment_result, swot_result, insight_result = parse_analysis(raw_result)
+
+            # Only well-formed answers go into the semantic cache
+            if embedding is not None and not sentiment_result.startswith(AI_ERROR_PREFIX):
+                entries = sem_cache.setdefault(task, [])
+                entries.append((embedding, raw_result))
+                del entries[:-SEMANTIC_CACHE_MAX_ENTRIES]
+
+            stats = st.session_state.llm_cache_stats
+            if source == "semantic":
+                stats["semantic_hits"] += 1
+            elif cache_misses:
+                stats["misses"] += 1
+            else:
+                stats["hits"] += 1
+
+            pdf_report = create_pdf_report(
+                sentiment_result, swot_result, insight_result
             )
-            pdf.set_font("DejaVu", "", 12)
 
-            pdf.cell(0, 10, "📝 Sentiment Analysis:", ln=True)
-            pdf.multi_cell(0, 10, sentiment)
-            pdf.ln(5)
+            if not sentiment_result.startswith(AI_ERROR_PREFIX):
+                st.session_state.last_fp = fp
+                st.session_state.last_results = (
+                    sentiment_result, swot_result, insight_result, pdf_report
+                )
 
-            pdf.cell(0, 10, "🏋️ SWOT Analysis:", ln=True)
-            pdf.multi_cell(0, 10, swot)
-            pdf.ln(5)
+        # Final (complete) results
+        sentiment_placeholder.write(sentiment_result)
+        swot_placeholder.write(swot_result)
+        insight_placeholder.write(insight_result)
 
-            pdf.cell(0, 10, "🔎 AI Insights on Patterns & Anomalies:", ln=True)
-            pdf.multi_cell(0, 10, insight)
-            pdf.ln(5)
+        st.success("✅ All analyses completed successfully.")
 
-            return pdf.output(dest="S").encode("latin1")
+        with st.expander("🐞 Debug: LLM cache"):
+            st.write(st.session_state.llm_cache_stats)
 
-        pdf_report = create_pdf_report(
-            sentiment_result, swot_result, insight_result
-        )
         st.download_button(
             label="Download the report as PDF",
             data=pdf_report,
@@ -15,13 +15,96 @@ FIREBASE_WEB_API_KEY = "..."
 
 """
 
+import functools
 import json
-import requests
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import httpx
+import orjson
 import streamlit as st
 import firebase_admin
 from firebase_admin import credentials
 
 
+# -----------------------------
+# Paylaşılan HTTP client
+# -----------------------------
+_MAX_RETRIES = 3
+
+# Tek bir HTTP/2 httpx.Client: identitytoolkit.googleapis.com ile tek TCP+TLS
+# bağlantısı açık kalır ve eşzamanlı istekler aynı bağlantı üzerinde multiplex edilir.
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(10.0, connect=3.05),
+    limits=httpx.Limits(max_keepalive_connections=10),
+)
+
+# Transport hatalarında (bağlantı kurulamaması, read timeout) ve 429/5xx
+# cevaplarında exponential backoff ile en fazla 3 kez tekrar denenir (toplam 4 deneme);
+# 429/503'te Retry-After header'ına uyulur; sunucu _MAX_RETRY_AFTER'dan uzun
+# beklenmesini isterse Streamlit script'ini bloklamamak için son cevap hemen döner.
+# Denemeler bitince son cevap döner, böylece Firebase'in hata mesajı
+# kullanıcıya gösterilebilir.
+_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+_BACKOFF_FACTOR = 0.2
+_MAX_RETRY_AFTER = 5.0  # saniye
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def get_client() -> httpx.Client:
+    """
+    Firebase REST çağrılarında kullanılan paylaşılan client'ı döndürür.
+    Testlerde mock client enjekte etmek için tek erişim noktası.
+    """
+    return _CLIENT
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    """
+    Retry-After header'ını (saniye ya da HTTP tarihi) bekleme süresine çevirir.
+    Header yoksa ya da okunamıyorsa None döner.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _post_json(url: str, payload: dict) -> httpx.Response:
+    """
+    Payload'u orjson ile (tek seferde, bytes olarak) serialize edip POST eder.
+    """
+    body = orjson.dumps(payload)
+    for attempt in range(_MAX_RETRIES + 1):
+        last_attempt = attempt == _MAX_RETRIES
+        delay = _BACKOFF_FACTOR * (2**attempt)
+        try:
+            resp = get_client().post(url, content=body, headers=_JSON_HEADERS)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+        else:
+            if resp.status_code not in _RETRY_STATUSES or last_attempt:
+                return resp
+            retry_after = _retry_after(resp) if resp.status_code in (429, 503) else None
+            if retry_after is not None:
+                if retry_after > _MAX_RETRY_AFTER:
+                    return resp
+                delay = retry_after
+        time.sleep(delay)
+
+
 # -----------------------------
 # Firebase Admin başlatma
 # -----------------------------
@@ -43,37 +126,61 @@ def init_firebase():
         )
         return
 
-    raw_json = st.secrets["FIREBASE_KEY"]
-
-    # FIREBASE_KEY şu anda uzun bir JSON string şeklinde
-    # onu dict'e parse ediyoruz
     try:
-        if isinstance(raw_json, str):
-            firebase_config = json.loads(raw_json)
-        else:
-            # Bazı durumlarda secrets direkt dict olabilir
-            firebase_config = dict(raw_json)
+        firebase_config = _load_service_account()
     except Exception as e:
         st.error(f"Failed to parse FIREBASE_KEY JSON: {e}")
         return
 
+    try:
+        firebase_admin.initialize_app(
+            _build_cred(), {"projectId": firebase_config.get("project_id")}
+        )
+    except Exception as e:
+        st.error(f"Failed to initialize Firebase Admin SDK: {e}")
+
+
+@functools.cache
+def _load_service_account() -> dict:
+    """
+    st.secrets["FIREBASE_KEY"] içindeki service account JSON'unu parse eder.
+    Sonuç process boyunca cache'lenir; Streamlit rerun'larında tekrar parse edilmez.
+    (Parse hatası cache'lenmez.)
+    """
+    raw_json = st.secrets["FIREBASE_KEY"]
+
+    # FIREBASE_KEY şu anda uzun bir JSON string şeklinde
+    # onu dict'e parse ediyoruz
+    if isinstance(raw_json, str):
+        return json.loads(raw_json)
+    # Bazı durumlarda secrets direkt dict olabilir
+    return dict(raw_json)
+
+
+@functools.cache
+def _build_cred() -> credentials.Certificate:
+    """
+    Service account'tan Certificate oluşturur: private_key newline düzeltmesi
+    ve RSA private key parse'ı process başına yalnızca bir kez yapılır.
+    """
+    firebase_config = dict(_load_service_account())
+
     # private_key içindeki \n kaçışlarını gerçek newline'a çevir
     if "private_key" in firebase_config:
         firebase_config["private_key"] = firebase_config["private_key"].replace("\\n", "\n")
 
-    try:
-        cred = credentials.Certificate(firebase_config)
-        firebase_admin.initialize_app(cred, {"projectId": firebase_config.get("project_id")})
-    except Exception as e:
-        st.error(f"Failed to initialize Firebase Admin SDK: {e}")
+    return credentials.Certificate(firebase_config)
 
 
 # -----------------------------
 # Yardımcı: Web API key çekme
 # -----------------------------
+@functools.lru_cache(maxsize=1)
 def _get_api_key() -> str:
     """
     Firebase Web API key'i secrets içinden çeker.
+    Key process boyunca değişmediği için sonuç cache'lenir
+    (hata durumunda cache'lenmez, bir sonraki çağrıda tekrar denenir).
 
     Senin secrets yapına göre:
     - Tercihen FIREBASE_WEB_API_KEY kullanıyoruz.
@@ -107,6 +214,25 @@ def _get_api_key() -> str:
     )
 
 
+_IDENTITY_TOOLKIT_URL = "https://identitytoolkit.googleapis.com/v1/accounts"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_signup_url() -> str:
+    """
+    signUp endpoint URL'i (API key dahil), process başına bir kez oluşturulur.
+    """
+    return f"{_IDENTITY_TOOLKIT_URL}:signUp?key={_get_api_key()}"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_signin_url() -> str:
+    """
+    signInWithPassword endpoint URL'i (API key dahil), process başına bir kez oluşturulur.
+    """
+    return f"{_IDENTITY_TOOLKIT_URL}:signInWithPassword?key={_get_api_key()}"
+
+
 def _extract_error_message(resp_json: dict) -> str:
     """
     Firebase REST error mesajından okunabilir bir mesaj çıkarır.
@@ -132,8 +258,7 @@ def sign_up_user(email: str, password: str):
     if not email or not password:
         return False, "Email and password are required."
 
-    api_key = _get_api_key()
-    url = f"https://identitytoolkit.googleapis.com/v1/accounts:signUp?key={api_key}"
+    url = _get_signup_url()
 
     payload = {
         "email": email,
@@ -142,7 +267,7 @@ def sign_up_user(email: str, password: str):
     }
 
     try:
-        resp = requests.post(url, data=json.dumps(payload))
+        resp = _post_json(url, payload)
         data = resp.json()
 
         if resp.status_code == 200:
@@ -169,8 +294,7 @@ def sign_in_user(email: str, password: str):
     if not email or not password:
         return False, "Email and password are required."
 
-    api_key = _get_api_key()
-    url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
+    url = _get_signin_url()
 
     payload = {
         "email": email,
@@ -179,7 +303,7 @@ def sign_in_user(email: str, password: str):
     }
 
     try:
-        resp = requests.post(url, data=json.dumps(payload))
+        resp = _post_json(url, payload)
         data = resp.json()
 
         if resp.status_code == 200:
@@ -5,21 +5,67 @@ Metin temizleme, normalizasyon ve basit NLP ön işleme fonksiyonları.
 Streamlit uygulamasındaki müşteri yorumlarını AI analizine hazırlamak için kullanılır.
 """
 
+import functools
 import re
+from importlib import resources
+from typing import Iterable, List
+
 import pandas as pd
 import numpy as np
-import nltk
-from nltk.corpus import stopwords
-from textblob import TextBlob
+import pyarrow as pa
+import pyarrow.compute as pc
+from joblib import Parallel, delayed
+from symspellpy import SymSpell, Verbosity
+
+
+# ---------------------------------------------------------
+# 📖 Stopword listesi (lazy)
+# ---------------------------------------------------------
+@functools.cache
+def _stopwords() -> frozenset:
+    """
+    NLTK stopword listesini ilk ihtiyaç anında yükler (process başına bir kez).
+    Uygulama açılışında NLTK import / download maliyeti ödenmez.
+    """
+    import nltk
+    from nltk.corpus import stopwords
+
+    # NLTK gerekli paketleri yükle (ilk çalıştırmada gerekebilir)
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords")
+
+    return frozenset(stopwords.words("english"))
 
-# NLTK gerekli paketleri yükle (ilk çalıştırmada gerekebilir)
-try:
-    nltk.data.find("corpora/stopwords")
-except LookupError:
-    nltk.download("stopwords")
 
-# Stopword listesi
-STOPWORDS = set(stopwords.words("english"))
+# Temizlikte kullanılan regex'ler (modül yüklenirken bir kez derlenir)
+# HTML tag'leri ilk geçişte ayrı silinir: URL'ye yapışık bir tag ("...item<br>Excellent")
+# URL ile birlikte sonraki kelimeyi de yutmasın diye.
+# URL | özel karakter: tek alternation, ikinci geçiş
+_TAG_RE = re.compile(r"<.*?>")
+_CLEAN_RE = re.compile(r"http\S+|www\.\S+|[^A-Za-z0-9,.!?'\s]")
+
+# _CLEAN_RE'nin Arrow (RE2) karşılığı: RE2'de \s / \S sadece ASCII whitespace'i kapsar,
+# bu sınıf ise Python'un Unicode \s'iyle (str.isspace) birebir aynı karakterleri içerir.
+# Aksi halde URL dalı NBSP / \v gibi karakterleri geçip sonraki kelimeyi de silerdi.
+_RE2_WS = r"\s\pZ\x0b\x1c-\x1f\x85"
+_RE2_CLEAN_PATTERN = rf"http[^{_RE2_WS}]+|www\.[^{_RE2_WS}]+|[^A-Za-z0-9,.!?'{_RE2_WS}]"
+
+_WS_RE = re.compile(r"\s+")
+
+
+@functools.cache
+def _drop_token_re() -> re.Pattern:
+    """
+    normalize_text'in token filtresinin regex hali: boşlukla ayrılmış bir token
+    stopword ise ya da 1-2 karakterliyse eşleşir (split() ile aynı token sınırları).
+    Stopword listesine bağlı olduğu için o da ilk kullanımda derlenir.
+    """
+    words = sorted(_stopwords(), key=len, reverse=True)
+    return re.compile(
+        r"(?<!\S)(?:" + "|".join(re.escape(w) for w in words) + r"|\S{1,2})(?!\S)"
+    )
 
 
 # ---------------------------------------------------------
@@ -35,18 +81,14 @@ def clean_text_basic(text: str) -> str:
         return ""
 
     text = text.strip()
+    if not text:
+        return ""
 
-    # HTML tag'leri sil
-    text = re.sub(r"<.*?>", " ", text)
-
-    # URL'leri kaldır
-    text = re.sub(r"http\S+|www\.\S+", " ", text)
-
-    # Özel karakterler
-    text = re.sub(r"[^A-Za-z0-9,.!?'\s]", " ", text)
+    # Önce HTML tag'leri, sonra URL'ler ve özel karakterler tek geçişte silinir
+    text = _CLEAN_RE.sub(" ", _TAG_RE.sub(" ", text))
 
     # Fazla boşlukları tek boşluğa indir
-    text = re.sub(r"\s+", " ", text)
+    text = _WS_RE.sub(" ", text)
 
     return text.strip()
 
@@ -60,31 +102,74 @@ def normalize_text(text: str) -> str:
     gereksiz kısa kelimeleri filtreleme.
     """
 
-    if not isinstance(text, str):
+    # 3 karakterden kısa metinde filtreden geçebilecek token olamaz
+    if not isinstance(text, str) or len(text) < 3:
         return ""
 
-    text = text.lower()
-
-    words = text.split()
-    filtered_words = [w for w in words if w not in STOPWORDS and len(w) > 2]
+    # Tek regex geçişi: stopword ve kısa token'ları sil, boşlukları toparla
+    text = _drop_token_re().sub("", text.lower())
 
-    return " ".join(filtered_words)
+    return _WS_RE.sub(" ", text).strip()
 
 
 # ---------------------------------------------------------
-# ✨ Spelling correction (TextBlob)
+# ✨ Spelling correction (SymSpell)
 # ---------------------------------------------------------
+_SPELL_MAX_EDIT_DISTANCE = 2
+# Kesme işaretli kelimeler (it's, wasn't, product's) tek token olarak yakalanır
+_SPELL_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+
+
+@functools.cache
+def _sym_spell() -> SymSpell:
+    """
+    SymSpell sözlüğünü process başına bir kez yükler.
+    Yükleme birkaç saniye sürdüğü için spelling ilk kez açıldığında yapılır.
+    """
+    sym_spell = SymSpell(max_dictionary_edit_distance=_SPELL_MAX_EDIT_DISTANCE)
+    dictionary = resources.files("symspellpy") / "frequency_dictionary_en_82_765.txt"
+    with resources.as_file(dictionary) as path:
+        sym_spell.load_dictionary(str(path), term_index=0, count_index=1)
+    return sym_spell
+
+
+@functools.lru_cache(maxsize=100_000)
+def _correct_word(word: str) -> str:
+    """
+    Tek kelimeyi düzeltir; aynı kelime tekrar geldiğinde cache'den döner.
+    Sözlükte yakın bir karşılığı yoksa kelime olduğu gibi kalır.
+    Kesme işaretli kelimeler (kısaltma / iyelik) sözlükte parça parça
+    bulunmadığı için düzeltilmeden geçirilir.
+    """
+    if "'" in word:
+        return word
+
+    suggestions = _sym_spell().lookup(
+        word,
+        Verbosity.CLOSEST,
+        max_edit_distance=_SPELL_MAX_EDIT_DISTANCE,
+        include_unknown=True,
+        transfer_casing=True,
+    )
+    return suggestions[0].term if suggestions else word
+
+
 def correct_spelling(text: str, enabled: bool = False) -> str:
     """
     AI modeli daha hatasız input isterse spelling düzeltebilir.
     Bu işlem maliyetli olduğundan default kapalı.
+    Sadece harflerden oluşan kelimeler düzeltilir; noktalama, sayılar ve
+    kesme işaretli kelimeler korunur.
+
+    >>> correct_spelling("it's wasn't product's", enabled=True)
+    "it's wasn't product's"
     """
 
     if not enabled:
         return text
 
     try:
-        return str(TextBlob(text).correct())
+        return _SPELL_WORD_RE.sub(lambda m: _correct_word(m.group(0)), text)
     except Exception:
         # Hata durumunda orijinal metni geri ver
         return text
@@ -103,26 +188,141 @@ def preprocess_reviews(text: str, correct=False) -> str:
     App tarafından direkt kullanılmak üzere optimize edilmiştir.
     """
 
-    if not text:
+    # Boş / string olmayan / çok kısa input'lar için tek kontrol:
+    # 3 karakterden kısa metinden len > 2 koşulunu sağlayan token çıkamaz
+    if not isinstance(text, str) or len(text) < 3:
         return ""
 
-    text = clean_text_basic(text)
-    text = normalize_text(text)
-    text = correct_spelling(text, enabled=correct)
+    return _preprocess(text, correct)
 
-    return text
+
+def _preprocess(text: str, correct: bool) -> str:
+    """
+    clean_text_basic + normalize_text + correct_spelling'in tek fonksiyonda birleşmiş hali.
+    Ara string'ler (strip / whitespace collapse / split-join) üretilmez:
+    iki regex geçişi (tag, URL + özel karakter), token'lar üzerinde tek filtre, tek join.
+    """
+
+    stop = _stopwords()
+    words = (
+        w
+        for w in _CLEAN_RE.sub(" ", _TAG_RE.sub(" ", text)).lower().split()
+        if len(w) > 2 and w not in stop
+    )
+    if correct:
+        words = (correct_spelling(w, enabled=True) for w in words)
+
+    return " ".join(words)
+
+
+# ---------------------------------------------------------
+# 📚 Liste halinde preprocess
+# ---------------------------------------------------------
+def preprocess_review_list(reviews: Iterable[str], correct=False) -> List[str]:
+    """
+    Yorumları tek tek temizler ve liste olarak döndürür.
+    Yorumlar tek bir string'e birleştirilmez; böylece yorum sınırları korunur
+    ve büyük input'larda gereksiz string kopyaları oluşmaz.
+    Temizlik sonrası boş kalan yorumlar atlanır.
+    """
+
+    cleaned = (preprocess_reviews(r, correct=correct) for r in reviews)
+    return [r for r in cleaned if r]
 
 
 # ---------------------------------------------------------
 # 📊 DataFrame destek fonksiyonu
 # ---------------------------------------------------------
-def load_reviews_from_dataframe(df: pd.DataFrame, text_column: str):
+@functools.cache
+def _stopwords_array() -> pa.Array:
+    """
+    Stopword listesinin Arrow hali (pc.is_in için value_set).
+    """
+    return pa.array(sorted(_stopwords()), type=pa.large_string())
+
+
+def _preprocess_series(s: pd.Series) -> pd.Series:
+    """
+    preprocess_reviews'in (spelling hariç) kolon bazlı hali.
+    Tüm adımlar pyarrow.compute kernel'leriyle (C++) tüm kolon üzerinde çalışır;
+    satır başına Python nesnesi oluşturulmaz.
+    """
+    arr = pa.array(s, type=pa.large_string())
+
+    # Basic cleaning (HTML / URL / özel karakter) + lowercase
+    arr = pc.replace_substring_regex(arr, pattern=_TAG_RE.pattern, replacement=" ")
+    arr = pc.replace_substring_regex(arr, pattern=_RE2_CLEAN_PATTERN, replacement=" ")
+    arr = pc.utf8_lower(arr)
+
+    # Token'lara böl (split() gibi whitespace'e göre), stopword ve kısa token'ları at
+    tokens = pc.utf8_split_whitespace(arr)
+    flat = pc.list_flatten(tokens)
+    keep = pc.and_(
+        pc.greater(pc.utf8_length(flat), 2),
+        pc.invert(pc.is_in(flat, value_set=_stopwords_array())),
+    )
+
+    # Kalan token'ları satırlarına geri topla ve tek boşlukla birleştir
+    parents = pc.filter(pc.list_parent_indices(tokens), keep).to_numpy()
+    counts = np.bincount(parents, minlength=len(arr))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+    kept = pa.ListArray.from_arrays(pa.array(offsets), pc.filter(flat, keep))
+
+    joined = pc.binary_join(kept, pa.scalar(" ", type=pa.large_string()))
+    return pd.Series(joined.to_pylist(), index=s.index, dtype=object)
+
+
+# Bu sayının altındaki (benzersiz) yorum sayısında process başlatma maliyeti
+# kazançtan büyük olduğu için seri yola düşülür
+_PARALLEL_MIN_ROWS = 50_000
+_PARALLEL_CHUNK_SIZE = 10_000
+
+
+def _preprocess_series_parallel(s: pd.Series) -> pd.Series:
+    """
+    Büyük kolonları parçalara bölüp _preprocess_series'i tüm çekirdeklerde çalıştırır.
+    """
+    if len(s) < _PARALLEL_MIN_ROWS:
+        return _preprocess_series(s)
+
+    chunks = [
+        s.iloc[i : i + _PARALLEL_CHUNK_SIZE] for i in range(0, len(s), _PARALLEL_CHUNK_SIZE)
+    ]
+    results = Parallel(n_jobs=-1, prefer="processes")(
+        delayed(_preprocess_series)(chunk) for chunk in chunks
+    )
+    return pd.concat(results)
+
+
+def _preprocess_series_spell(s: pd.Series) -> pd.Series:
+    """
+    Spelling correction açıkken kullanılan pipeline: önce vektörize temizlik,
+    sonra temizlenmiş yorumlar üzerinde SymSpell düzeltmesi.
+    Düzeltme sadece harf dizilerine uygulandığı için token token düzeltmeyle aynı sonucu verir.
+    """
+    return _preprocess_series_parallel(s).map(functools.partial(correct_spelling, enabled=True))
+
+
+def load_reviews_from_dataframe(df: pd.DataFrame, text_column: str, correct=False):
     """
     DataFrame'deki text kolonlarını alıp temizler.
     Çok sayıda yorum varsa AI'a gönderilmeden önce temiz input sağlar.
+
+    preprocess_reviews ile aynı sonucu verir ama satır satır Python döngüsü
+    yerine tüm kolonu pyarrow.compute kernel'leriyle tek seferde işler
+    (büyük kolonlarda joblib ile parçalara bölünerek). Spelling correction
+    açıksa düzeltme, temizlenmiş yorumlar üzerinde satır bazlı .map ile yapılır.
+    Tekrarlanan yorumlar ("Great product!" gibi) sadece bir kez temizlenir.
     """
     try:
-        reviews = df[text_column].dropna().astype(str).tolist()
-        return [preprocess_reviews(r) for r in reviews]
+        s = df[text_column].dropna().astype(str)
+
+        # Pipeline bir kez seçilir; spelling kapalıyken satır başına hiçbir Python çağrısı yapılmaz
+        pipeline = _preprocess_series_spell if correct else _preprocess_series_parallel
+
+        # Benzersiz yorumları temizle, sonucu orijinal sıraya geri dağıt
+        codes, uniques = pd.factorize(s)
+        cleaned = pipeline(pd.Series(uniques, dtype=object)).to_numpy()
+        return cleaned[codes].tolist()
     except Exception as e:
         raise ValueError(f"Error extracting text column '{text_column}': {e}")